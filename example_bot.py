@@ -109,8 +109,8 @@ def talk_handler(msg: Message):
     if msg.text.startswith("/"):
         return
 
-    # Ответ на конкретные слова
-    text = msg.text.lower()
+    # Ответ на конкретные слова (text_lower вычисляется один раз на сообщение)
+    text = msg.text_lower
 
     if "привет" in text:
         msg.reply("Здарова! 👋")
@@ -1,10 +1,49 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
 import time
 import logging
 import os
 import sys
+import random
 import inspect
-from typing import Dict, List, Optional, Callable, Any, Union, Tuple
+import functools
+import threading
+import collections
+import concurrent.futures
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Callable,
+    Any,
+    Union,
+    FrozenSet,
+    Deque,
+    Set,
+    Iterable,
+    Tuple,
+)
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    import json
+
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
 
 # --- Type Aliases ---
 MessagePayload = Dict[str, Any]
@@ -12,14 +51,62 @@ CommandHandler = Callable[..., None]
 MessageHandler = Callable[["Message"], None]
 GenericEventHandler = Callable[..., Any]
 EventDecorator = Callable[[GenericEventHandler], GenericEventHandler]
+# (handler, sync, busy policy) as stored in Bot.event_handlers.
+EventRegistration = Tuple[GenericEventHandler, bool, str]
 
 DEFAULT_API_URL = "https://s1.deadrat.exelus.space/api/bot"
 
+# Connection pool tuning: the bot talks to a single host, so a handful of
+# pools with enough keep-alive sockets for bursts of replies is plenty.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+# Responses worth retrying: rate limiting and transient server failures.
+RETRY_STATUSES: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+# Network failures worth retrying. Anything else is a bug or a permanent
+# error and is left to propagate.
+RECOVERABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+# How many undeliverable requests Bot.dead_letters keeps before dropping the oldest.
+DEAD_LETTER_LIMIT = 1024
+
+# Polling backoff: delay = min(POLL_BACKOFF_CAP, POLL_BACKOFF_BASE * 2**failures),
+# plus jitter. After BREAKER_THRESHOLD 5xx responses in a row polling pauses
+# for BREAKER_COOLDOWN seconds.
+POLL_BACKOFF_BASE = 0.5
+POLL_BACKOFF_CAP = 30.0
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60.0
+
+# Events whose handlers run inline by default: their order relative to the
+# run loop matters (e.g. startup must finish before the first message).
+SYNC_EVENTS: FrozenSet[str] = frozenset({"startup", "shutdown"})
+
+# What to do when an event fires while its previous asynchronous run is unfinished.
+EVENT_BUSY_POLICIES: FrozenSet[str] = frozenset({"queue", "drop", "wait"})
+
+# Handler dispatch: worker threads, and how many messages may be queued or
+# running at once before polling waits for handlers to catch up.
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_IN_FLIGHT = 32
+
+# Asynchronous event handlers run on their own small pool, so an event fired
+# from a message handler never waits on a task queued behind that handler.
+EVENT_WORKERS = 4
+EVENT_THREAD_PREFIX = "deadrat-event"
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s"
 )
 logger = logging.getLogger("deadrat_bot_framework")
 
+# Marks lazily computed attributes that have not been computed yet.
+_UNSET: Any = object()
+
 
 class SentMessage:
     """
@@ -80,6 +167,8 @@ class Author:
         username (str): The display name of the user.
     """
 
+    __slots__ = ("id", "username")
+
     def __init__(self, data: MessagePayload) -> None:
         self.id: Optional[str] = data.get("author_id")
         self.username: Optional[str] = data.get("username")
@@ -88,23 +177,22 @@ class Author:
         return f"<Author username='{self.username}'>"
 
 
-class Message:
+class ReplyMessage:
     """
-    Represents a message received by the bot.
-    Contains methods to reply directly to this message.
+    The message another message replies to, as returned by
+    `Message.reply_to_message`. Also the base class of `Message`.
+
+    Exposes the same fields as `Message` (`id`, `text`, `author`, `timestamp`,
+    `raw`, `text_lower`) and can be replied to, but has no `command`, `args` or
+    nested `reply_to_message`.
 
     Args:
         data (dict): The raw JSON payload for the message.
         bot (Bot): The Bot instance that received this message.
-
-    Attributes:
-        text (str): The full text content of the message.
-        author (Author): The author of the message.
-        reply_to_message (Message | None): The message object this message is replying to (if any).
-        command (str | None): The command trigger (e.g., "/start") if present.
-        args (list[str]): List of arguments following the command.
     """
 
+    __slots__ = ("bot", "id", "author", "text", "timestamp", "raw", "_text_lower")
+
     def __init__(self, data: MessagePayload, bot: "Bot") -> None:
         self.bot: "Bot" = bot
         self.id: Optional[str] = data.get("id")
@@ -112,20 +200,14 @@ class Message:
         self.text: str = data.get("text", "").strip()
         self.timestamp: Optional[float] = data.get("timestamp")
         self.raw: MessagePayload = data
+        self._text_lower: Optional[str] = None
 
-        self.command: Optional[str] = None
-        self.args: List[str] = []
-        parts = self.text.split(" ", 1)
-        if parts:
-            self.command = parts[0].lower()
-            if len(parts) > 1:
-                self.args = parts[1].split()
-
-        reply_data: Optional[MessagePayload] = data.get("replyToMessage")
-        if reply_data:
-            self.reply_to_message: Optional["Message"] = Message(reply_data, self.bot)
-        else:
-            self.reply_to_message: Optional["Message"] = None
+    @property
+    def text_lower(self) -> str:
+        """The message text in lower case."""
+        if self._text_lower is None:
+            self._text_lower = self.text.lower()
+        return self._text_lower
 
     def reply(
         self, text: Optional[str] = None, image_url: Optional[str] = None
@@ -166,41 +248,301 @@ class Message:
         return f"<Message from {self.author.username}: {self.text[:20]}...>"
 
 
+class Message(ReplyMessage):
+    """
+    Represents a message received by the bot.
+    Contains methods to reply directly to this message.
+
+    Args:
+        data (dict): The raw JSON payload for the message.
+        bot (Bot): The Bot instance that received this message.
+
+    Attributes:
+        text (str): The full text content of the message.
+        author (Author): The author of the message.
+        reply_to_message (ReplyMessage | None): The message this message is replying
+                                                to (if any). It carries the same
+                                                fields and reply methods, but no
+                                                command parsing.
+        command (str | None): The command trigger (e.g., "/start") if the text starts
+                              with the prefix of a registered command.
+        args (list[str]): List of arguments following the command.
+        text_lower (str): The text in lower case, handy for case-insensitive matching.
+
+    `reply_to_message`, `args` and `text_lower` are computed on first access.
+    """
+
+    __slots__ = ("command", "_args", "_reply")
+
+    def __init__(self, data: MessagePayload, bot: "Bot") -> None:
+        super().__init__(data, bot)
+
+        # Only text starting like a registered trigger can be a command, so
+        # ordinary chat messages skip lower-casing entirely.
+        text = self.text
+        first_space = text.find(" ")
+        head = text if first_space < 0 else text[:first_space]
+        self.command: Optional[str] = (
+            head.lower() if head and head[0] in bot._prefixes else None
+        )
+
+        self._args: Optional[List[str]] = None
+        self._reply: Any = _UNSET
+
+    @property
+    def args(self) -> List[str]:
+        """List of arguments following the command."""
+        if self._args is None:
+            self._args = self.text.partition(" ")[2].split()
+        return self._args
+
+    @property
+    def reply_to_message(self) -> Optional[ReplyMessage]:
+        """The message this message is replying to (if any)."""
+        if self._reply is _UNSET:
+            reply_data: Optional[MessagePayload] = self.raw.get("replyToMessage")
+            self._reply = ReplyMessage(reply_data, self.bot) if reply_data else None
+        return self._reply
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    """Returns the `Retry-After` delay in seconds, if the server sent one."""
+    value = resp.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(int(value)))
+    except ValueError:
+        return None
+
+
+def _arity(func: Callable[..., Any]) -> int:
+    """
+    Returns how many parameters a handler declares, counted the same way as
+    `len(inspect.signature(func).parameters)` (`*args` and `**kwargs` included).
+    """
+    code = getattr(func, "__code__", None)
+    if code is None or hasattr(func, "__wrapped__"):
+        # Callable objects, partials and decorated functions.
+        return len(inspect.signature(func).parameters)
+    count = code.co_argcount + code.co_kwonlyargcount
+    if code.co_flags & inspect.CO_VARARGS:
+        count += 1
+    if code.co_flags & inspect.CO_VARKEYWORDS:
+        count += 1
+    return count - (1 if inspect.ismethod(func) else 0)
+
+
+def _serialized(func: CommandHandler) -> CommandHandler:
+    """Wraps a handler so that at most one call of it runs at a time."""
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any) -> None:
+        with lock:
+            func(*args)
+
+    return wrapper
+
+
 class Bot:
     """
     The main Bot class that orchestrates API communication and message handling.
 
+    Each batch of incoming messages is handled on a pool of worker threads, so a
+    slow handler does not hold up the other messages of its batch. The next batch
+    is only fetched once every handler of the current one has finished.
+
     Args:
         api_key (str): Your unique API key for authentication.
         base_url (str, optional): The base URL for the bot API endpoint.
                                   Defaults to the official DeadRat API.
+        workers (int, optional): Number of handler threads. Defaults to 8.
+        max_in_flight (int, optional): Maximum number of messages queued or being
+                                       handled at once. Polling pauses while the
+                                       limit is reached. Defaults to 32.
+
+    Raises:
+        ValueError: If `workers` or `max_in_flight` is less than 1.
     """
 
-    def __init__(self, api_key: str, base_url: str = DEFAULT_API_URL) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = DEFAULT_API_URL,
+        workers: int = DEFAULT_WORKERS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+
         self.api_key: str = api_key
         self.base_url: str = base_url.rstrip("/")
         self.root_url: str = self.base_url.replace("/bot", "")
 
+        self._updates_url: str = f"{self.base_url}/updates"
+        self._send_url: str = f"{self.base_url}/send"
+        self._upload_url: str = f"{self.root_url}/upload"
+        self._edit_prefix: str = f"{self.base_url}/edit/"
+        self._delete_prefix: str = f"{self.base_url}/delete/"
+
         self.session: requests.Session = requests.Session()
-        self.session.headers.update({"x-api-key": self.api_key})
+        self.session.headers.update(
+            {
+                "x-api-key": self.api_key,
+                "Connection": "keep-alive",
+                # Servers that can stream updates as they arrive send NDJSON.
+                "Accept": "application/x-ndjson, application/json;q=0.9",
+            }
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            pool_block=False,
+            max_retries=0,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-        self.command_handlers: Dict[str, Tuple[CommandHandler, bool]] = {}
+        self.command_handlers: Dict[str, MessageHandler] = {}
+        # First characters of all registered triggers, e.g. {"/", "!"}.
+        self._prefixes: Set[str] = set()
         self.message_handlers: List[MessageHandler] = []
-        self.event_handlers: Dict[str, Optional[GenericEventHandler]] = {
+        self.event_handlers: Dict[str, Optional[EventRegistration]] = {
             "startup": None,
             "shutdown": None,
             "connection_error": None,
             "error": None,
+            "dead_letter": None,
         }
 
+        # Requests that were still failing after all retries, oldest first.
+        self.dead_letters: Deque[MessagePayload] = collections.deque(
+            maxlen=DEAD_LETTER_LIMIT
+        )
+
+        self._workers: int = workers
+        self._make_pools()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._event_futures: Dict[str, "concurrent.futures.Future[None]"] = {}
+        self._event_lock = threading.Lock()
+
         self.last_ts: float = 0.0
 
+        self._fail_streak: int = 0
+        self._server_error_streak: int = 0
+        self._breaker_open_until: float = 0.0
+
+    # --- HTTP ---
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        payload: Optional[MessagePayload] = None,
+        *,
+        max_retries: int = 3,
+        base: float = 1.0,
+        cap: float = 30.0,
+        retry_status: FrozenSet[int] = RETRY_STATUSES,
+        rebuild: Optional[Callable[[], Dict[str, Any]]] = None,
+        dead_letter: bool = True,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Internal method that sends an HTTP request, retrying transient failures.
+
+        Responses with a status in `retry_status`, connection errors and timeouts
+        are retried up to `max_retries` times with exponential backoff and jitter.
+        A numeric `Retry-After` header overrides the computed delay, but is still
+        limited to `cap` seconds.
+
+        Args:
+            payload (dict, optional): JSON body. Encoded with orjson when it is
+                                      installed, otherwise with the stdlib.
+            rebuild (callable, optional): Called before every attempt; the returned
+                                          dict is merged into the request kwargs.
+                                          Used for bodies that cannot be replayed.
+            dead_letter (bool, optional): Record the request in `dead_letters` and
+                                          fire the `'dead_letter'` event once all
+                                          retries are exhausted. Defaults to True.
+
+        Returns:
+            requests.Response: The last response received. If the final attempt
+            raised, the exception is re-raised instead.
+        """
+        if payload is not None:
+            kwargs["data"] = _json_dumps(payload)
+            kwargs["headers"] = {"Content-Type": "application/json"}
+
+        attempt = 0
+        while True:
+            if rebuild is not None:
+                kwargs.update(rebuild())
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except RECOVERABLE_ERRORS as e:
+                if attempt >= max_retries:
+                    if dead_letter:
+                        self._dead_letter(method, url, payload, None, attempt + 1)
+                    raise
+                reason = type(e).__name__
+                delay = None
+            else:
+                if resp.status_code not in retry_status:
+                    return resp
+                if attempt >= max_retries:
+                    if dead_letter:
+                        self._dead_letter(
+                            method, url, payload, resp.status_code, attempt + 1
+                        )
+                    return resp
+                reason = str(resp.status_code)
+                delay = _retry_after(resp)
+                if delay is not None:
+                    delay = min(cap, delay)
+
+            if delay is None:
+                delay = min(cap, base * 2**attempt) * (1 + random.random() * 0.5)
+            attempt += 1
+            logger.warning(
+                f"{method} {url} failed ({reason}), "
+                f"retry {attempt}/{max_retries} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+    def _dead_letter(
+        self,
+        method: str,
+        url: str,
+        payload: Optional[MessagePayload],
+        status: Optional[int],
+        attempts: int,
+    ) -> None:
+        """Internal method that records a request which could not be delivered."""
+        entry: MessagePayload = {
+            "method": method,
+            "url": url,
+            "payload": payload,
+            "status": status,
+            "attempts": attempts,
+            "ts": time.time(),
+        }
+        self.dead_letters.append(entry)
+        logger.error(f"Giving up on {method} {url} after {attempts} attempts")
+        self._trigger("dead_letter", entry)
+
     # --- API Actions ---
 
     def upload_file(self, file_path: str) -> Optional[str]:
         """
         Uploads a file to the server.
 
+        With `requests-toolbelt` installed the file is streamed from disk,
+        otherwise the whole multipart body is built in memory first.
+
         Args:
             file_path (str): The local path to the file.
 
@@ -210,18 +552,42 @@ class Bot:
         if not os.path.exists(file_path):
             logger.error(f"File not found: {file_path}")
             return None
-        url = f"{self.root_url}/upload"
-        try:
-            with open(file_path, "rb") as f:
-                files = {"file": f}
-                resp = self.session.post(url, files=files)
-            if resp.status_code == 200:
-                return resp.json().get("file_url")
-            else:
-                logger.error(f"Upload failed ({resp.status_code}): {resp.text}")
+        with open(file_path, "rb") as f:
+
+            def rewind() -> Dict[str, Any]:
+                f.seek(0)
+                if MultipartEncoder is None:
+                    return {"files": {"file": f}}
+                encoder = MultipartEncoder(
+                    fields={
+                        "file": (
+                            os.path.basename(file_path),
+                            f,
+                            "application/octet-stream",
+                        )
+                    }
+                )
+                return {
+                    "data": encoder,
+                    "headers": {
+                        "Content-Type": encoder.content_type,
+                        "Content-Length": str(encoder.len),
+                    },
+                }
+
+            try:
+                resp = self._request("POST", self._upload_url, rebuild=rewind)
+            except RECOVERABLE_ERRORS as e:
+                logger.error(f"Upload error: {e}")
                 return None
-        except Exception as e:
-            logger.error(f"Upload error: {e}")
+
+        if resp.status_code != 200:
+            logger.error(f"Upload failed ({resp.status_code}): {resp.text}")
+            return None
+        try:
+            return _json_loads(resp.content).get("file_url")
+        except ValueError as e:
+            logger.error(f"Upload returned invalid JSON: {e}")
             return None
 
     def send_message(
@@ -241,25 +607,30 @@ class Bot:
         Returns:
             SentMessage | None: A SentMessage object on success, or None on failure.
         """
+        payload: Dict[str, Any] = {}
+        if text:
+            payload["text"] = text
+        if image_url:
+            payload["imageUrl"] = image_url
+        if reply_to_id:
+            payload["replyTo"] = reply_to_id
+
         try:
-            payload: Dict[str, Any] = {}
-            if text:
-                payload["text"] = text
-            if image_url:
-                payload["imageUrl"] = image_url
-            if reply_to_id:
-                payload["replyTo"] = reply_to_id
-
-            resp = self.session.post(f"{self.base_url}/send", json=payload)
-            if resp.status_code == 200:
-                return SentMessage(resp.json(), self, initial_text=text)
-            else:
-                logger.error(f"Send failed ({resp.status_code}): {resp.text}")
-                return None
-        except Exception as e:
+            resp = self._request("POST", self._send_url, payload)
+        except RECOVERABLE_ERRORS as e:
             logger.error(f"Send error: {e}")
             return None
 
+        if resp.status_code != 200:
+            logger.error(f"Send failed ({resp.status_code}): {resp.text}")
+            return None
+        try:
+            data = _json_loads(resp.content)
+        except ValueError as e:
+            logger.error(f"Send returned invalid JSON: {e}")
+            return None
+        return SentMessage(data, self, initial_text=text)
+
     def edit_message(self, target: Union[SentMessage, str], new_text: str) -> bool:
         """
         Edits an existing message.
@@ -275,11 +646,11 @@ class Bot:
         if not msg_id:
             return False
         try:
-            resp = self.session.put(
-                f"{self.base_url}/edit/{msg_id}", json={"text": new_text}
+            resp = self._request(
+                "PUT", self._edit_prefix + str(msg_id), {"text": new_text}
             )
             return resp.status_code == 200
-        except Exception:
+        except RECOVERABLE_ERRORS:
             return False
 
     def delete_message(self, target: Union[SentMessage, str]) -> bool:
@@ -296,14 +667,16 @@ class Bot:
         if not msg_id:
             return False
         try:
-            resp = self.session.delete(f"{self.base_url}/delete/{msg_id}")
+            resp = self._request("DELETE", self._delete_prefix + str(msg_id))
             return resp.status_code == 200
-        except Exception:
+        except RECOVERABLE_ERRORS:
             return False
 
     # --- Decorators for registering handlers ---
 
-    def command(self, trigger: str) -> Callable[[CommandHandler], CommandHandler]:
+    def command(
+        self, trigger: str, concurrent: bool = True
+    ) -> Callable[[CommandHandler], CommandHandler]:
         """
         Decorator: Registers a function to handle a specific command.
 
@@ -316,20 +689,32 @@ class Bot:
 
         Args:
             trigger (str): The command string (e.g., "/start" or "!help").
+            concurrent (bool, optional): Whether several invocations of this handler
+                                         may run at the same time. Pass False for
+                                         handlers that are not thread-safe.
+                                         Defaults to True.
         """
 
-        def decorator(func: CommandHandler) -> CommandHandler:
-            sig = inspect.signature(func)
-            params = sig.parameters
-            wants_args = len(params) == 2
+        # `concurrent` is part of the public signature, so it keeps its name even
+        # though it shadows the `concurrent` module here; the module is not
+        # needed in this method.
+        serialize = not concurrent
 
-            if len(params) > 2:
+        def decorator(func: CommandHandler) -> CommandHandler:
+            arity = _arity(func)
+            if arity > 2:
                 logger.warning(
-                    f"Command '{trigger}' handler has {len(params)} args. "
+                    f"Command '{trigger}' handler has {arity} args. "
                     f"Only the first 2 will be used (Message, List[str])."
                 )
 
-            self.command_handlers[trigger] = (func, wants_args)
+            call = _serialized(func) if serialize else func
+            # Resolve the calling convention once so dispatch is a single call.
+            if arity == 2:
+                self.command_handlers[trigger] = lambda msg: call(msg, msg.args)
+            else:
+                self.command_handlers[trigger] = call
+            self._prefixes = {t[0] for t in self.command_handlers if t}
             return func
 
         return decorator
@@ -352,7 +737,9 @@ class Bot:
 
         return decorator
 
-    def event(self, event_name: str) -> EventDecorator:
+    def event(
+        self, event_name: str, sync: Optional[bool] = None, busy: str = "queue"
+    ) -> EventDecorator:
         """
         Decorator: Registers a handler for lifecycle events.
 
@@ -364,12 +751,33 @@ class Bot:
             ```
 
         Args:
-            event_name (str): The event type. Options: `'startup'`, `'shutdown'`, `'error'`.
+            event_name (str): The event type. Options: `'startup'`, `'shutdown'`,
+                              `'connection_error'`, `'error'`, `'dead_letter'`.
+                              A `'dead_letter'` handler receives a dict describing
+                              a request that failed after all retries.
+            sync (bool, optional): Run the handler inline, blocking whoever fired
+                                   the event. Otherwise it runs on a dedicated
+                                   event pool of `EVENT_WORKERS` threads
+                                   prefixed `deadrat-event`, separate from the
+                                   message handler pool. Defaults to True for `'startup'`
+                                   and `'shutdown'`, False for everything else.
+            busy (str, optional): What to do when the event fires while the previous
+                                  asynchronous run is still going: `'queue'` runs it
+                                  anyway, `'drop'` skips the new event and `'wait'`
+                                  waits for the previous run first. A warning is
+                                  logged in every case. When the event is fired
+                                  from an event pool thread (e.g. by another event
+                                  handler), `'wait'` behaves like `'queue'` so the
+                                  pool cannot wait on itself. Defaults to `'queue'`.
         """
+        if busy not in EVENT_BUSY_POLICIES:
+            logger.warning(f"Unknown busy policy '{busy}', using 'queue'")
+            busy = "queue"
+        run_inline = event_name in SYNC_EVENTS if sync is None else sync
 
         def decorator(func: GenericEventHandler) -> GenericEventHandler:
             if event_name in self.event_handlers:
-                self.event_handlers[event_name] = func
+                self.event_handlers[event_name] = (func, run_inline, busy)
             else:
                 logger.warning(f"Unknown event type: {event_name}")
             return func
@@ -378,14 +786,183 @@ class Bot:
 
     def _trigger(self, event_name: str, *args: Any) -> None:
         """Internal method to safely execute an event handler."""
-        handler = self.event_handlers.get(event_name)
-        if handler:
+        registration = self.event_handlers.get(event_name)
+        if not registration:
+            return
+        handler, sync, busy = registration
+        if sync:
+            self._run_event(event_name, handler, args)
+            return
+
+        with self._event_lock:
+            pending = self._event_futures.get(event_name)
+            running = pending is not None and not pending.done()
+            if running:
+                logger.warning(f"'{event_name}' handler is still running ({busy})")
+                if busy == "drop":
+                    return
+            # An event thread waiting on the event pool could wait on a task
+            # queued behind itself, so there 'wait' behaves like 'queue'.
+            must_wait = (
+                running
+                and busy == "wait"
+                and not threading.current_thread().name.startswith(
+                    EVENT_THREAD_PREFIX
+                )
+            )
+            if not must_wait:
+                submitted = self._submit_event(event_name, handler, args)
+
+        if must_wait:
+            concurrent.futures.wait([pending])
+            with self._event_lock:
+                submitted = self._submit_event(event_name, handler, args)
+
+        if not submitted:
+            # The event pool is already shut down (e.g. while stopping). Run the
+            # handler here, outside the lock, since it may fire events itself.
+            self._run_event(event_name, handler, args)
+
+    def _submit_event(
+        self, event_name: str, handler: GenericEventHandler, args: Tuple[Any, ...]
+    ) -> bool:
+        """
+        Internal method that schedules an event handler. Needs `_event_lock`.
+
+        Returns False if the event pool is already shut down.
+        """
+        try:
+            future = self._event_pool.submit(self._run_event, event_name, handler, args)
+        except RuntimeError:
+            return False
+        self._event_futures[event_name] = future
+        return True
+
+    def _run_event(
+        self, event_name: str, handler: GenericEventHandler, args: Tuple[Any, ...]
+    ) -> None:
+        """Internal method that calls an event handler and logs its errors."""
+        try:
+            handler(*args)
+        except Exception as e:
+            logger.error(f"Error in '{event_name}' handler: {e}")
+
+    # --- Main Run Loop ---
+
+    def _make_pools(self) -> None:
+        """Internal method that creates the handler and event thread pools."""
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="deadrat-handler"
+        )
+        self._event_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=EVENT_WORKERS, thread_name_prefix=EVENT_THREAD_PREFIX
+        )
+
+    def _drain_pools(self) -> None:
+        """
+        Internal method that waits for all running handlers, then replaces the
+        pools with fresh ones so that `run()` can be called again.
+        """
+        self._pool.shutdown(wait=True)
+        self._event_pool.shutdown(wait=True)
+        self._make_pools()
+
+    def _submit(self, msg: Message) -> "concurrent.futures.Future[None]":
+        """
+        Internal method that schedules a message for dispatch on the handler pool.
+
+        Blocks while `max_in_flight` messages are already queued or running.
+        """
+        self._in_flight.acquire()
+        try:
+            future = self._pool.submit(self._dispatch, msg)
+        except BaseException:
+            self._in_flight.release()
+            raise
+        future.add_done_callback(lambda _: self._in_flight.release())
+        return future
+
+    def _dispatch(self, msg: Message) -> None:
+        """
+        Internal method that routes a single message to its handlers.
+
+        Exceptions raised by handlers are reported through the `'error'` event
+        and never propagate back into the polling loop.
+        """
+        logger.info(f"[{msg.author.username}]: {msg.text}")
+
+        command_handler = self.command_handlers.get(msg.command)
+        if command_handler:
             try:
-                handler(*args)
+                command_handler(msg)
             except Exception as e:
-                logger.error(f"Error in '{event_name}' handler: {e}")
+                logger.error(f"Error in command handler for '{msg.command}': {e}")
+                self._trigger("error", e, msg)
+            return
 
-    # --- Main Run Loop ---
+        for handler in self.message_handlers:
+            try:
+                handler(msg)
+            except Exception as e:
+                logger.error(f"Error in message handler: {e}")
+                self._trigger("error", e, msg)
+
+    def _read_updates(self, resp: requests.Response) -> Iterable[MessagePayload]:
+        """
+        Internal method that yields updates from an `/updates` response.
+
+        NDJSON responses are decoded line by line as they arrive; anything else
+        is treated as a single JSON array. A read timeout while streaming the
+        body just ends the batch: the long poll window passed without more data.
+        """
+        try:
+            if "ndjson" in resp.headers.get("Content-Type", ""):
+                for line in resp.iter_lines(chunk_size=4096):
+                    if line:
+                        yield _json_loads(line)
+            else:
+                yield from _json_loads(resp.content)
+        except requests.exceptions.ReadTimeout:
+            return
+        except requests.exceptions.ConnectionError as e:
+            # requests reports a read timeout on a streamed body this way.
+            if e.args and isinstance(e.args[0], ReadTimeoutError):
+                return
+            raise
+
+    def _process_batch(self, messages: Iterable[MessagePayload]) -> None:
+        """
+        Internal method that dispatches a batch of updates and waits for it.
+
+        Messages are submitted as soon as they are read and the next poll only
+        starts once every handler in the batch has finished. `last_ts` then moves
+        past the newest message that was submitted, even if reading the batch
+        failed partway, so no message is handled twice. Updates without a
+        timestamp are logged and skipped.
+        """
+        new_ts: Optional[float] = None
+        futures: List["concurrent.futures.Future[None]"] = []
+        try:
+            for msg_data in messages:
+                ts = msg_data.get("timestamp")
+                if ts is None:
+                    logger.warning(f"Skipping update without timestamp: {msg_data}")
+                    continue
+                if new_ts is None or ts > new_ts:
+                    new_ts = ts
+                futures.append(self._submit(Message(msg_data, self)))
+        finally:
+            concurrent.futures.wait(futures)
+            if new_ts is not None:
+                self.last_ts = new_ts + 0.000001
+
+    def _backoff(self) -> None:
+        """Internal method that sleeps after a failed poll, longer on each failure."""
+        exponent = min(self._fail_streak, 16)
+        delay = min(POLL_BACKOFF_CAP, POLL_BACKOFF_BASE * 2**exponent)
+        delay *= 1 + random.random() * 0.5
+        self._fail_streak += 1
+        time.sleep(delay)
 
     def run(self) -> None:
         """
@@ -396,13 +973,19 @@ class Bot:
         """
         logger.info(f"🤖 Connecting to {self.base_url}...")
         try:
-            resp = self.session.get(
-                f"{self.base_url}/updates", params={"after_ts": 0.0}, timeout=5
+            resp = self._request(
+                "GET",
+                self._updates_url,
+                params={"after_ts": 0.0},
+                timeout=5,
+                dead_letter=False,
             )
             if resp.status_code == 200:
-                initial_messages: List[MessagePayload] = resp.json()
-                if initial_messages:
-                    self.last_ts = initial_messages[-1]["timestamp"] + 0.000001
+                timestamps = [
+                    m["timestamp"] for m in self._read_updates(resp) if "timestamp" in m
+                ]
+                if timestamps:
+                    self.last_ts = max(timestamps) + 0.000001
                     logger.info(f"✅ Synced. Last TS: {self.last_ts}")
                 else:
                     self.last_ts = time.time()
@@ -417,61 +1000,70 @@ class Bot:
         try:
             while True:
                 try:
-                    resp = self.session.get(
-                        f"{self.base_url}/updates",
+                    pause = self._breaker_open_until - time.monotonic()
+                    if pause > 0:
+                        time.sleep(pause)
+                        self._breaker_open_until = 0.0
+
+                    # The loop below handles its own failures, so a long poll
+                    # is never retried inside _request.
+                    resp = self._request(
+                        "GET",
+                        self._updates_url,
                         params={"after_ts": self.last_ts},
                         timeout=25,
+                        stream=True,
+                        max_retries=0,
+                        dead_letter=False,
                     )
 
                     if resp.status_code == 200:
-                        messages: List[MessagePayload] = resp.json()
-                        for msg_data in messages:
-                            self.last_ts = msg_data["timestamp"]
-                            msg = Message(msg_data, self)
-
-                            logger.info(f"[{msg.author.username}]: {msg.text}")
-
-                            cmd_triggered = False
-                            handler_data = self.command_handlers.get(msg.command)
-
-                            if handler_data:
-                                func, wants_args = handler_data
-                                try:
-                                    if wants_args:
-                                        func(msg, msg.args)
-                                    else:
-                                        func(msg)
-                                except Exception as e:
-                                    logger.error(
-                                        f"Error in command handler for '{msg.command}': {e}"
-                                    )
-                                    self._trigger("error", e, msg)
-
-                                cmd_triggered = True
-
-                            if not cmd_triggered:
-                                for handler in self.message_handlers:
-                                    handler(msg)
+                        self._fail_streak = 0
+                        self._server_error_streak = 0
+                        try:
+                            self._process_batch(self._read_updates(resp))
+                        finally:
+                            resp.close()
 
                     elif resp.status_code == 403:
+                        resp.close()
                         logger.critical("⛔ Invalid API Key")
                         break
                     else:
+                        resp.close()
                         logger.warning(f"Server returned: {resp.status_code}")
-                        time.sleep(2)
+                        if resp.status_code >= 500:
+                            self._server_error_streak += 1
+                        else:
+                            self._server_error_streak = 0
+
+                        if self._server_error_streak >= BREAKER_THRESHOLD:
+                            logger.error(
+                                f"Server keeps failing, pausing polling "
+                                f"for {BREAKER_COOLDOWN:.0f}s"
+                            )
+                            self._server_error_streak = 0
+                            self._breaker_open_until = (
+                                time.monotonic() + BREAKER_COOLDOWN
+                            )
+                        else:
+                            self._backoff()
 
                 except requests.exceptions.ReadTimeout:
                     continue
                 except requests.exceptions.ConnectionError:
                     logger.error("Connection lost.")
                     self._trigger("connection_error")
-                    time.sleep(5)
+                    self._backoff()
                 except Exception as e:
                     logger.error(f"Loop error: {e}")
                     self._trigger("error", e)
-                    time.sleep(1)
+                    self._backoff()
 
         except KeyboardInterrupt:
             logger.info("Stopping bot...")
+            self._drain_pools()
             self._trigger("shutdown")
             sys.exit(0)
+
+        self._drain_pools()
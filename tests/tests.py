@@ -1,6 +1,15 @@
+import concurrent.futures
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, patch, mock_open
-from deadrat import Bot, Message, SentMessage, Author
+import requests
+from urllib3.exceptions import ReadTimeoutError
+import deadrat
+from deadrat import Bot, Message, ReplyMessage, SentMessage, Author
 
 
 class TestDeadRatFramework(unittest.TestCase):
@@ -14,6 +23,27 @@ class TestDeadRatFramework(unittest.TestCase):
 
     # --- ТЕСТЫ ВСПОМОГАТЕЛЬНЫХ КЛАССОВ ---
 
+    def test_session_pooling(self):
+        bot = Bot(self.api_key, base_url="http://localhost:8080/api/bot/")
+        adapter = bot.session.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertIs(bot.session.get_adapter("http://example.com"), adapter)
+        self.assertEqual(bot.session.headers["Connection"], "keep-alive")
+
+        # URL-ы эндпоинтов собираются один раз
+        self.assertEqual(bot._updates_url, "http://localhost:8080/api/bot/updates")
+        self.assertEqual(bot._send_url, "http://localhost:8080/api/bot/send")
+        self.assertEqual(bot._upload_url, "http://localhost:8080/api/upload")
+        self.assertEqual(bot._edit_prefix, "http://localhost:8080/api/bot/edit/")
+        self.assertEqual(bot._delete_prefix, "http://localhost:8080/api/bot/delete/")
+
+    def test_bot_invalid_limits(self):
+        # Нулевые лимиты иначе навсегда блокируют опрос
+        with self.assertRaises(ValueError):
+            Bot(self.api_key, workers=0)
+        with self.assertRaises(ValueError):
+            Bot(self.api_key, max_in_flight=0)
+
     def test_author_init(self):
         data = {"author_id": "123", "username": "RatKing"}
         author = Author(data)
@@ -51,9 +81,8 @@ class TestDeadRatFramework(unittest.TestCase):
         }
         msg = Message(data, self.bot)
         self.assertEqual(msg.text, "Hello world")
-        self.assertEqual(
-            msg.command, "hello"
-        )  # command парсится как первое слово lower()
+        # Нет зарегистрированной команды с таким префиксом -> не команда
+        self.assertIsNone(msg.command)
         self.assertEqual(msg.args, ["world"])
         self.assertIsNone(msg.reply_to_message)
         self.assertIn("User", repr(msg))
@@ -62,8 +91,28 @@ class TestDeadRatFramework(unittest.TestCase):
         reply_data = {"id": "0", "text": "old", "author_id": "u2", "username": "Old"}
         data["replyToMessage"] = reply_data
         msg_reply = Message(data, self.bot)
-        self.assertIsInstance(msg_reply.reply_to_message, Message)
-        self.assertEqual(msg_reply.reply_to_message.text, "old")
+        reply = msg_reply.reply_to_message
+        # Реплай - облегченное сообщение без разбора команды
+        self.assertIsInstance(reply, ReplyMessage)
+        self.assertNotIsInstance(reply, Message)
+        self.assertEqual(reply.text, "old")
+        self.assertEqual(reply.author.username, "Old")
+        self.assertFalse(hasattr(reply, "command"))
+        # Реплай строится один раз и кешируется
+        self.assertIs(msg_reply.reply_to_message, msg_reply.reply_to_message)
+
+        # 3. Ленивые поля
+        msg = Message({"id": "2", "text": "  Hi THERE  "}, self.bot)
+        self.assertEqual(msg.text_lower, "hi there")
+        self.assertEqual(msg.args, ["THERE"])
+        self.assertIsNone(Message({"id": "3"}, self.bot).command)
+
+        # 4. Команда распознается по префиксу зарегистрированных триггеров
+        self.bot.command("!help")(lambda msg: None)
+        self.assertEqual(self.bot._prefixes, {"!"})
+        self.assertEqual(Message({"text": "!HELP me"}, self.bot).command, "!help")
+        self.assertEqual(Message({"text": "!other"}, self.bot).command, "!other")
+        self.assertIsNone(Message({"text": "/help"}, self.bot).command)
 
     def test_message_actions(self):
         msg = Message({"id": "1", "text": "hi"}, self.bot)
@@ -86,9 +135,11 @@ class TestDeadRatFramework(unittest.TestCase):
 
     # --- ТЕСТЫ МЕТОДОВ API БОТА ---
 
+    @patch("deadrat.MultipartEncoder", None)
+    @patch("time.sleep")
     @patch("os.path.exists")
     @patch("builtins.open", new_callable=mock_open, read_data=b"data")
-    def test_upload_file(self, mock_file, mock_exists):
+    def test_upload_file(self, mock_file, mock_exists, mock_sleep):
         # 1. Файл не существует
         mock_exists.return_value = False
         self.assertIsNone(self.bot.upload_file("fake.txt"))
@@ -97,64 +148,213 @@ class TestDeadRatFramework(unittest.TestCase):
         mock_exists.return_value = True
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.json.return_value = {"file_url": "http://suc.cess"}
-        self.bot.session.post.return_value = mock_resp
+        mock_resp.headers = {}
+        mock_resp.content = b'{"file_url": "http://suc.cess"}'
+        self.bot.session.request.return_value = mock_resp
 
         url = self.bot.upload_file("real.txt")
         self.assertEqual(url, "http://suc.cess")
 
-        # 3. Ошибка сервера
+        # 3. Ошибка сервера (после всех повторов)
         mock_resp.status_code = 500
         self.assertIsNone(self.bot.upload_file("real.txt"))
+        self.assertEqual(mock_sleep.call_count, 3)
+        # Перед каждой попыткой файл перематывается в начало
+        self.assertEqual(mock_file.return_value.seek.call_count, 5)
+
+    @unittest.skipIf(
+        deadrat.MultipartEncoder is None, "requests-toolbelt не установлен"
+    )
+    def test_upload_file_streaming(self):
+        with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as tmp:
+            tmp.write(b"streamed data")
+        self.addCleanup(os.remove, tmp.name)
+
+        bodies = []
+
+        def fake_request(method, url, **kwargs):
+            # Тело читается потоком из открытого файла
+            bodies.append((kwargs["headers"], kwargs["data"].read()))
+            return MagicMock(status_code=200, content=b'{"file_url": "http://f"}')
+
+        self.bot.session.request.side_effect = fake_request
+
+        self.assertEqual(self.bot.upload_file(tmp.name), "http://f")
+        headers, body = bodies[0]
+        self.assertIn(b"streamed data", body)
+        self.assertEqual(headers["Content-Length"], str(len(body)))
+        self.assertTrue(headers["Content-Type"].startswith("multipart/form-data"))
 
     def test_send_message_api(self):
         # Успех
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.json.return_value = {"id": "10"}
-        self.bot.session.post.return_value = mock_resp
+        mock_resp.content = b'{"id": "10"}'
+        self.bot.session.request.return_value = mock_resp
 
-        res = self.bot.send_message("hi")
+        res = self.bot.send_message("hi", reply_to_id="5")
         self.assertIsInstance(res, SentMessage)
         self.assertEqual(res.id, "10")
 
-        # Ошибка
+        # Тело запроса сериализуется заранее в JSON-байты
+        kwargs = self.bot.session.request.call_args[1]
+        self.assertEqual(json.loads(kwargs["data"]), {"text": "hi", "replyTo": "5"})
+        self.assertEqual(kwargs["headers"]["Content-Type"], "application/json")
+
+        # Ошибка (400 не повторяется)
         mock_resp.status_code = 400
         self.assertIsNone(self.bot.send_message("hi"))
+        self.assertEqual(self.bot.session.request.call_count, 2)
+
+    @patch("time.sleep")
+    def test_api_error_handling(self, mock_sleep):
+        # Сетевые ошибки (после повторов) -> None/False
+        self.bot.session.request.side_effect = requests.exceptions.ConnectionError()
+        self.assertIsNone(self.bot.send_message("hi"))
+        self.assertFalse(self.bot.edit_message("1", "new"))
+        self.assertFalse(self.bot.delete_message("1"))
+
+        # Битый JSON в ответе -> None
+        self.bot.session.request.side_effect = None
+        self.bot.session.request.return_value = MagicMock(
+            status_code=200, headers={}, content=b"<html>"
+        )
+        self.assertIsNone(self.bot.send_message("hi"))
+
+        # Ошибки программиста не глотаются
+        self.bot.session.request.side_effect = TypeError("bad call")
+        with self.assertRaises(TypeError):
+            self.bot.send_message("hi")
+        with self.assertRaises(TypeError):
+            self.bot.delete_message("1")
 
     def test_edit_delete_api(self):
         sent = SentMessage({"id": "1"}, self.bot)
 
         # Edit успех
-        self.bot.session.put.return_value.status_code = 200
+        self.bot.session.request.return_value.status_code = 200
         self.assertTrue(self.bot.edit_message(sent, "new"))
 
         # Edit провал (например, нет ID)
         self.assertFalse(self.bot.edit_message("", "new"))
 
         # Delete успех
-        self.bot.session.delete.return_value.status_code = 200
         self.assertTrue(self.bot.delete_message(sent))
+        self.bot.session.request.assert_called_with(
+            "DELETE", f"{self.bot.base_url}/delete/1"
+        )
+
+    @patch("time.sleep")
+    @patch("random.random", return_value=0.0)
+    def test_request_retries(self, mock_random, mock_sleep):
+        busy = MagicMock(status_code=503, headers={"Retry-After": "7"})
+        ok = MagicMock(status_code=200, headers={})
+        self.bot.session.request.side_effect = [
+            busy,
+            requests.exceptions.ConnectionError(),
+            ok,
+        ]
+
+        resp = self.bot._request("GET", "http://x")
+        self.assertIs(resp, ok)
+        # Retry-After от сервера, затем экспоненциальная задержка (1.0 * 2**1)
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list], [7.0, 2.0])
+
+        # Retry-After тоже ограничен cap
+        mock_sleep.reset_mock()
+        self.bot.session.request.side_effect = [
+            MagicMock(status_code=429, headers={"Retry-After": "3600"}),
+            ok,
+        ]
+        self.bot._request("GET", "http://x", cap=30.0)
+        mock_sleep.assert_called_once_with(30.0)
+
+        # Все попытки исчерпаны -> исключение пробрасывается
+        self.bot.session.request.side_effect = requests.exceptions.Timeout()
+        with self.assertRaises(requests.exceptions.Timeout):
+            self.bot._request("GET", "http://x", max_retries=1)
+
+    @patch("time.sleep")
+    def test_dead_letters(self, mock_sleep):
+        on_dead = MagicMock()
+
+        @self.bot.event("dead_letter", sync=True)
+        def handler(entry):
+            on_dead(entry)
+
+        self.bot.session.request.return_value = MagicMock(status_code=502, headers={})
+        self.assertIsNone(self.bot.send_message("lost"))
+
+        self.assertEqual(len(self.bot.dead_letters), 1)
+        entry = self.bot.dead_letters[0]
+        self.assertEqual(entry["method"], "POST")
+        self.assertEqual(entry["payload"], {"text": "lost"})
+        self.assertEqual(entry["status"], 502)
+        self.assertEqual(entry["attempts"], 4)
+        on_dead.assert_called_once_with(entry)
+
+        # Неповторяемые ошибки в DLQ не попадают
+        self.bot.session.request.return_value.status_code = 400
+        self.bot.send_message("bad")
+        self.assertEqual(len(self.bot.dead_letters), 1)
 
     # --- ТЕСТЫ ДЕКОРАТОРОВ И ХЕНДЛЕРОВ ---
 
     def test_command_registration(self):
+        msg = Message({"id": "1", "text": "/cmd a b"}, self.bot)
+        calls = []
+
         # 1. Один аргумент (msg)
         @self.bot.command("/start")
         def start(msg):
-            pass
+            calls.append((msg,))
 
         self.assertIn("/start", self.bot.command_handlers)
-        func, wants_args = self.bot.command_handlers["/start"]
-        self.assertFalse(wants_args)
+        self.bot.command_handlers["/start"](msg)
+        self.assertEqual(calls.pop(), (msg,))
 
         # 2. Два аргумента (msg, args)
         @self.bot.command("/echo")
         def echo(msg, args):
-            pass
-
-        func, wants_args = self.bot.command_handlers["/echo"]
-        self.assertTrue(wants_args)
+            calls.append((msg, args))
+
+        self.bot.command_handlers["/echo"](msg)
+        self.assertEqual(calls.pop(), (msg, ["a", "b"]))
+
+        # 2b. (msg, *rest) тоже получает args, как и раньше
+        @self.bot.command("/rest")
+        def rest(msg, *rest):
+            calls.append((msg,) + rest)
+
+        self.bot.command_handlers["/rest"](msg)
+        self.assertEqual(calls.pop(), (msg, ["a", "b"]))
+
+        # 3. Метод объекта (self не считается)
+        class Handlers:
+            def ban(self, msg, args):
+                calls.append((msg, args))
+
+        self.bot.command("/ban")(Handlers().ban)
+        self.bot.command_handlers["/ban"](msg)
+        self.assertEqual(calls.pop(), (msg, ["a", "b"]))
+
+    def test_command_not_concurrent(self):
+        active = []
+        overlaps = []
+
+        @self.bot.command("/slow", concurrent=False)
+        def slow(msg):
+            active.append(msg)
+            if len(active) > 1:
+                overlaps.append(msg)
+            time.sleep(0.01)
+            active.remove(msg)
+
+        msgs = [Message({"id": str(i), "text": "/slow"}, self.bot) for i in range(4)]
+        futures = [self.bot._submit(m) for m in msgs]
+        for f in futures:
+            f.result()
+        self.assertEqual(overlaps, [])
 
     def test_on_message_registration(self):
         @self.bot.on_message()
@@ -168,7 +368,14 @@ class TestDeadRatFramework(unittest.TestCase):
         def on_start():
             pass
 
-        self.assertEqual(self.bot.event_handlers["startup"], on_start)
+        # startup по умолчанию выполняется синхронно
+        self.assertEqual(self.bot.event_handlers["startup"], (on_start, True, "queue"))
+
+        @self.bot.event("error", busy="drop")
+        def on_error(e, msg=None):
+            pass
+
+        self.assertEqual(self.bot.event_handlers["error"], (on_error, False, "drop"))
 
         # Неизвестный эвент (должен логировать warning, но не падать)
         @self.bot.event("unknown")
@@ -180,10 +387,99 @@ class TestDeadRatFramework(unittest.TestCase):
 
     def test_trigger_event(self):
         mock_handler = MagicMock()
-        self.bot.event_handlers["startup"] = mock_handler
+        self.bot.event_handlers["startup"] = (mock_handler, True, "queue")
         self.bot._trigger("startup")
         mock_handler.assert_called_once()
 
+    def test_trigger_event_async(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow(e):
+            calls.append(e)
+            started.set()
+            release.wait(1)
+
+        # Асинхронный хендлер не блокирует вызывающий поток
+        self.bot.event_handlers["error"] = (slow, False, "drop")
+        self.bot._trigger("error", "first")
+        self.assertTrue(started.wait(1))
+
+        # Пока первый вызов не завершился, новое событие отбрасывается
+        self.bot._trigger("error", "second")
+        release.set()
+        self.bot._event_futures["error"].result(1)
+        self.assertEqual(calls, ["first"])
+
+        # wait: дожидается предыдущего вызова и запускает новый
+        release.clear()
+        self.bot.event_handlers["error"] = (slow, False, "wait")
+        self.bot._trigger("error", "third")
+        threading.Timer(0.05, release.set).start()
+        self.bot._trigger("error", "fourth")
+        self.bot._event_futures["error"].result(1)
+        self.assertEqual(calls, ["first", "third", "fourth"])
+
+    def test_event_wait_from_handler_threads(self):
+        # busy="wait" из потоков-обработчиков не должен вешать пул
+        bot = Bot(self.api_key, workers=2)
+        bot.session = MagicMock()
+        handled = []
+
+        @bot.event("error", busy="wait")
+        def on_error(e, msg=None):
+            time.sleep(0.02)
+            handled.append(msg.id)
+
+        @bot.on_message()
+        def failing(msg):
+            raise ValueError("boom")
+
+        msgs = [Message({"id": str(i), "text": "x"}, bot) for i in range(6)]
+        futures = [bot._submit(m) for m in msgs]
+        done, not_done = concurrent.futures.wait(futures, timeout=5)
+        self.assertEqual(not_done, set())
+        bot._event_futures["error"].result(5)
+        self.assertEqual(sorted(handled), [str(i) for i in range(6)])
+
+    def test_event_after_pool_shutdown(self):
+        # После остановки пула событие из обработчика события не должно зависать
+        self.bot._event_pool.shutdown()
+        dead = []
+
+        @self.bot.event("dead_letter")
+        def on_dead(letter):
+            dead.append(letter)
+
+        @self.bot.event("error")
+        def on_error(e, msg=None):
+            self.bot._trigger("dead_letter", "letter")
+
+        worker = threading.Thread(
+            target=self.bot._trigger, args=("error", ValueError("boom"))
+        )
+        worker.start()
+        worker.join(5)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(dead, ["letter"])
+
+    def test_dispatch_routes_errors(self):
+        # Ошибка в обычном хендлере не должна ломать остальные хендлеры
+        failing = MagicMock(side_effect=ValueError("boom"))
+        ok = MagicMock()
+        self.bot.message_handlers.extend([failing, ok])
+
+        on_error = MagicMock()
+        self.bot.event_handlers["error"] = (on_error, True, "queue")
+
+        msg = Message({"id": "1", "text": "hi"}, self.bot)
+        self.bot._dispatch(msg)
+
+        ok.assert_called_once_with(msg)
+        on_error.assert_called_once()
+        self.assertIs(on_error.call_args[0][1], msg)
+
     # --- ТЕСТ MAIN LOOP (bot.run) ---
 
     def test_run_logic(self):
@@ -198,41 +494,50 @@ class TestDeadRatFramework(unittest.TestCase):
 
         resp_sync = MagicMock()
         resp_sync.status_code = 200
-        resp_sync.json.return_value = []  # Пустая история
+        resp_sync.content = b"[]"  # Пустая история
 
         resp_msg = MagicMock()
         resp_msg.status_code = 200
-        resp_msg.json.return_value = [
-            {
-                "id": "1",
-                "text": "/cmd arg",
-                "timestamp": 10.0,
-                "username": "u1",
-            },  # Команда
-            {
-                "id": "2",
-                "text": "just text",
-                "timestamp": 11.0,
-                "username": "u1",
-            },  # Просто текст
-        ]
+        resp_msg.content = json.dumps(
+            [
+                {
+                    "id": "1",
+                    "text": "/cmd arg",
+                    "timestamp": 10.0,
+                    "username": "u1",
+                },  # Команда
+                {
+                    "id": "2",
+                    "text": "just text",
+                    "timestamp": 11.0,
+                    "username": "u1",
+                },  # Просто текст
+            ]
+        ).encode()
 
         # Настраиваем мок сессии на последовательные ответы
         # 1-й вызов - sync, 2-й - сообщения, 3-й - имитация выключения
-        self.bot.session.get.side_effect = [resp_sync, resp_msg, KeyboardInterrupt]
+        self.bot.session.request.side_effect = [
+            resp_sync,
+            resp_msg,
+            KeyboardInterrupt,
+        ]
 
         # Мокаем хендлеры
         mock_cmd = MagicMock()
-        self.bot.command_handlers["/cmd"] = (mock_cmd, True)  # Ждет аргументы
+
+        @self.bot.command("/cmd")
+        def cmd(msg, args):  # Ждет аргументы
+            mock_cmd(msg, args)
 
         mock_msg_handler = MagicMock()
         self.bot.message_handlers.append(mock_msg_handler)
 
         mock_startup = MagicMock()
-        self.bot.event_handlers["startup"] = mock_startup
+        self.bot.event_handlers["startup"] = (mock_startup, True, "queue")
 
         mock_shutdown = MagicMock()
-        self.bot.event_handlers["shutdown"] = mock_shutdown
+        self.bot.event_handlers["shutdown"] = (mock_shutdown, True, "queue")
 
         # Запускаем run. Ожидаем SystemExit (так как bot.run делает sys.exit(0))
         with self.assertRaises(SystemExit):
@@ -260,18 +565,156 @@ class TestDeadRatFramework(unittest.TestCase):
         # 4. Shutdown сработал
         mock_shutdown.assert_called_once()
 
+        # 5. Следующий опрос идет от самого нового сообщения пачки
+        self.assertAlmostEqual(self.bot.last_ts, 11.000001)
+        last_call = self.bot.session.request.call_args_list[-1]
+        self.assertEqual(last_call[1]["params"], {"after_ts": self.bot.last_ts})
+
+    def test_process_batch(self):
+        seen = []
+        self.bot.message_handlers.append(lambda msg: seen.append(msg.id))
+
+        # Сообщения пришли не по порядку -> берется максимальный timestamp
+        self.bot._process_batch(
+            [
+                {"id": "b", "text": "x", "timestamp": 20.0},
+                {"id": "a", "text": "y", "timestamp": 5.0},
+            ]
+        )
+        self.assertEqual(sorted(seen), ["a", "b"])
+        self.assertAlmostEqual(self.bot.last_ts, 20.000001)
+
+        # Пустая пачка не двигает last_ts
+        self.bot._process_batch([])
+        self.assertAlmostEqual(self.bot.last_ts, 20.000001)
+
+        # Сообщение без timestamp пропускается, остальные обрабатываются
+        seen.clear()
+        self.bot._process_batch(
+            [
+                {"id": "c", "text": "x", "timestamp": 30.0},
+                {"id": "d", "text": "y"},
+                {"id": "e", "text": "z", "timestamp": 31.0},
+            ]
+        )
+        self.assertEqual(sorted(seen), ["c", "e"])
+        self.assertAlmostEqual(self.bot.last_ts, 31.000001)
+
+        # Сбой посреди пачки: last_ts все равно сдвигается за уже отправленные
+        def broken():
+            yield {"id": "f", "text": "x", "timestamp": 40.0}
+            raise ValueError("bad line")
+
+        with self.assertRaises(ValueError):
+            self.bot._process_batch(broken())
+        self.assertAlmostEqual(self.bot.last_ts, 40.000001)
+
+    @patch("time.sleep")
+    @patch("random.random", return_value=0.0)
+    def test_run_backoff_and_breaker(self, mock_random, mock_sleep):
+        def resp(status, content=b"[]"):
+            return MagicMock(status_code=status, headers={}, content=content)
+
+        self.bot.session.request.side_effect = [
+            resp(200),  # Синхронизация
+            resp(503),
+            resp(503),
+            resp(503),  # Третья 5xx подряд -> пауза опроса
+            resp(200),
+            KeyboardInterrupt,
+        ]
+
+        with self.assertRaises(SystemExit):
+            self.bot.run()
+
+        delays = [c[0][0] for c in mock_sleep.call_args_list]
+        # Экспоненциальная задержка, затем пауза "автомата" вместо задержки
+        self.assertEqual(delays[:2], [0.5, 1.0])
+        self.assertEqual(len(delays), 3)
+        self.assertAlmostEqual(delays[2], 60.0, places=0)
+        # Успешный ответ сбрасывает счетчик неудач
+        self.assertEqual(self.bot._fail_streak, 0)
+
+    def test_read_updates(self):
+        # NDJSON: сообщения читаются построчно по мере поступления
+        resp = MagicMock(headers={"Content-Type": "application/x-ndjson"})
+        resp.iter_lines.return_value = iter(
+            [b'{"id": "1", "timestamp": 1.0}', b"", b'{"id": "2", "timestamp": 2.0}']
+        )
+        updates = list(self.bot._read_updates(resp))
+        self.assertEqual([u["id"] for u in updates], ["1", "2"])
+
+        # Обычный JSON-массив
+        resp = MagicMock(
+            headers={"Content-Type": "application/json"},
+            content=b'[{"id": "3", "timestamp": 3.0}]',
+        )
+        self.assertEqual(
+            list(self.bot._read_updates(resp)), [{"id": "3", "timestamp": 3.0}]
+        )
+        resp.iter_lines.assert_not_called()
+
+    def test_read_updates_stream_timeout(self):
+        # Простой NDJSON-потока дольше таймаута - это конец пачки, а не обрыв связи
+        def lines(chunk_size):
+            yield b'{"id": "1", "text": "x", "timestamp": 5.0}'
+            raise requests.exceptions.ConnectionError(
+                ReadTimeoutError(None, "/updates", "Read timed out.")
+            )
+
+        resp = MagicMock(headers={"Content-Type": "application/x-ndjson"})
+        resp.iter_lines.side_effect = lines
+        seen = []
+        self.bot.message_handlers.append(lambda msg: seen.append(msg.id))
+
+        self.bot._process_batch(self.bot._read_updates(resp))
+        self.assertEqual(seen, ["1"])
+        self.assertAlmostEqual(self.bot.last_ts, 5.000001)
+
+        # Настоящий обрыв связи пробрасывается дальше
+        resp.iter_lines.side_effect = requests.exceptions.ConnectionError("reset")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            list(self.bot._read_updates(resp))
+
+    def test_run_sync_ndjson(self):
+        resp_sync = MagicMock(
+            status_code=200, headers={"Content-Type": "application/x-ndjson"}
+        )
+        resp_sync.iter_lines.return_value = iter(
+            [b'{"id": "1", "timestamp": 7.0}', b'{"id": "2", "timestamp": 9.0}']
+        )
+        self.bot.session.request.side_effect = [resp_sync, KeyboardInterrupt]
+
+        with self.assertRaises(SystemExit):
+            self.bot.run()
+        # Синхронизация по NDJSON-ответу, а не по текущему времени
+        self.assertAlmostEqual(self.bot.last_ts, 9.000001)
+
     def test_run_403_error(self):
         # Тест невалидного токена
         resp_403 = MagicMock()
         resp_403.status_code = 403
 
         # Сразу возвращаем 403 при попытке получить апдейты
-        self.bot.session.get.return_value = resp_403
+        self.bot.session.request.return_value = resp_403
 
         # Цикл должен прерваться (break) без SystemExit
         self.bot.run()
         # Если метод завершился без зависания и ошибок - тест пройден
 
+        # Повторный запуск того же бота: пул потоков снова принимает задачи
+        resp_msg = MagicMock(
+            status_code=200,
+            headers={},
+            content=b'[{"id": "1", "text": "hi", "timestamp": 1.0}]',
+        )
+        self.bot.session.request.return_value = None
+        self.bot.session.request.side_effect = [resp_msg, resp_msg, resp_403]
+        seen = []
+        self.bot.message_handlers.append(lambda msg: seen.append(msg.id))
+        self.bot.run()
+        self.assertEqual(seen, ["1"])
+
 
 if __name__ == "__main__":
     unittest.main()